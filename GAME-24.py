@@ -1,27 +1,41 @@
 import random
 import itertools
-from typing import List, Tuple, Set
+import functools
+import multiprocessing
+import os
+import pickle
+import re
+import tempfile
+from typing import Callable, Dict, Final, List, Optional, Tuple, Set
 from fractions import Fraction
 import unittest
 from unittest.mock import patch
 from io import StringIO
 import sys
 
+# 可选加速：安装了 numba 时用 JIT 编译的内核做穷举搜索，
+# 只安装了 numpy 时用向量化搜索，都没有时使用纯 Python 实现
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
 class Card:
     """扑克牌类"""
+    __slots__ = ('suit', 'rank', 'value')
+    
+    # 牌面 -> 数值
+    _RANK_VALUES: Final = {'A': 1, **{str(i): i for i in range(2, 11)}, 'J': 11, 'Q': 12, 'K': 13}
+    
     def __init__(self, suit: str, rank: str):
         self.suit = suit
         self.rank = rank
-        self.value = self._get_value()
-    
-    def _get_value(self) -> int:
-        """获取牌的数值"""
-        if self.rank == 'A':
-            return 1
-        elif self.rank in ['J', 'Q', 'K']:
-            return {'J': 11, 'Q': 12, 'K': 13}[self.rank]
-        else:
-            return int(self.rank)
+        self.value = Card._RANK_VALUES[rank]
     
     def __str__(self):
         return f"{self.suit}{self.rank}"
@@ -29,6 +43,275 @@ class Card:
     def __repr__(self):
         return self.__str__()
 
+# ============================================================================
+# 整数分子/分母运算（代替 Fraction，避免每一步都构造对象和约分）
+# ============================================================================
+
+Rational = Tuple[int, int]
+Evaluator = Callable[..., Optional[Rational]]
+# (结构编号, 运算符编号 × 3)
+Combo = Tuple[int, int, int, int]
+
+def _add(x: Rational, y: Rational) -> Rational:
+    return x[0] * y[1] + y[0] * x[1], x[1] * y[1]
+
+def _sub(x: Rational, y: Rational) -> Rational:
+    return x[0] * y[1] - y[0] * x[1], x[1] * y[1]
+
+def _mul(x: Rational, y: Rational) -> Rational:
+    return x[0] * y[0], x[1] * y[1]
+
+def _div(x: Rational, y: Rational) -> Optional[Rational]:
+    """除数为0时返回 None，而不是抛出异常"""
+    if y[0] == 0:
+        return None
+    return x[0] * y[1], x[1] * y[0]
+
+_OP_FUNCS: Final = {'+': _add, '-': _sub, '*': _mul, '/': _div}
+
+# 以下工厂接收三个具体的运算函数，返回只做算术、不再判断字符串的 evaluate(a, b, c, d)。
+# 只有除法可能得到 None，中间结果为 None 时整个表达式直接返回 None
+
+def _make_shape0(f1, f2, f3):
+    """((a op1 b) op2 c) op3 d"""
+    def evaluate(a, b, c, d):
+        x = f1(a, b)
+        if x is None:
+            return None
+        x = f2(x, c)
+        if x is None:
+            return None
+        return f3(x, d)
+    return evaluate
+
+def _make_shape1(f1, f2, f3):
+    """(a op1 (b op2 c)) op3 d"""
+    def evaluate(a, b, c, d):
+        x = f2(b, c)
+        if x is None:
+            return None
+        x = f1(a, x)
+        if x is None:
+            return None
+        return f3(x, d)
+    return evaluate
+
+def _make_shape2(f1, f2, f3):
+    """(a op1 b) op2 (c op3 d)"""
+    def evaluate(a, b, c, d):
+        x = f1(a, b)
+        if x is None:
+            return None
+        y = f3(c, d)
+        if y is None:
+            return None
+        return f2(x, y)
+    return evaluate
+
+def _make_shape3(f1, f2, f3):
+    """a op1 ((b op2 c) op3 d)"""
+    def evaluate(a, b, c, d):
+        x = f2(b, c)
+        if x is None:
+            return None
+        x = f3(x, d)
+        if x is None:
+            return None
+        return f1(a, x)
+    return evaluate
+
+def _make_shape4(f1, f2, f3):
+    """a op1 (b op2 (c op3 d))"""
+    def evaluate(a, b, c, d):
+        x = f3(c, d)
+        if x is None:
+            return None
+        x = f2(b, x)
+        if x is None:
+            return None
+        return f1(a, x)
+    return evaluate
+
+# 表达式结构（按结构编号 0-4 排列）: (计算函数工厂, 显示模板)
+_STRUCTURES: Final = (
+    (_make_shape0, "(({a} {op1} {b}) {op2} {c}) {op3} {d}"),
+    (_make_shape1, "({a} {op1} ({b} {op2} {c})) {op3} {d}"),
+    (_make_shape2, "({a} {op1} {b}) {op2} ({c} {op3} {d})"),
+    (_make_shape3, "{a} {op1} (({b} {op2} {c}) {op3} {d})"),
+    (_make_shape4, "{a} {op1} ({b} {op2} ({c} {op3} {d}))"),
+)
+
+# 用于判断两个表达式是否代数等价的采样点：在这些"一般位置"上取值全部相同的
+# 两个表达式（如 (a + b) + c 与 a + (b + c)）视为同一个，只需搜索其中一个
+_SAMPLE_POINTS: Final = (
+    (1009, 2003, 3001, 4001),
+    (5003, 7001, 6007, 8009),
+    (9001, 1013, 3011, 2027),
+)
+
+def _signature(evaluate: Evaluator) -> Tuple:
+    """表达式在各采样点上的精确取值，作为等价类的标识"""
+    values = []
+    for point in _SAMPLE_POINTS:
+        result = evaluate(*[(x, 1) for x in point])
+        values.append(None if result is None else Fraction(*result))
+    return tuple(values)
+
+def _build_evaluators() -> Tuple[Tuple[Tuple[Evaluator, str], ...], Tuple[Combo, ...]]:
+    """
+    预先生成 5 种结构 × 64 种运算符组合的计算函数及其显示模板，
+    代数等价的组合只保留第一个。
+    同时返回每个保留组合的 Combo，供搜索内核使用。
+    """
+    evaluators = []
+    combos = []
+    seen = set()
+    for s, (make, template) in enumerate(_STRUCTURES):
+        for (i1, op1), (i2, op2), (i3, op3) in itertools.product(enumerate(_OP_FUNCS), repeat=3):
+            evaluate = make(_OP_FUNCS[op1], _OP_FUNCS[op2], _OP_FUNCS[op3])
+            signature = _signature(evaluate)
+            if signature in seen:
+                continue
+            seen.add(signature)
+            fmt = template.format(a='{a}', b='{b}', c='{c}', d='{d}', op1=op1, op2=op2, op3=op3)
+            evaluators.append((evaluate, fmt))
+            combos.append((s, i1, i2, i3))
+    return tuple(evaluators), tuple(combos)
+
+_EVALUATORS, _COMBOS = _build_evaluators()
+
+# ============================================================================
+# 穷举搜索内核（纯整数运算，可被 numba 编译）
+# ============================================================================
+
+# _COMBOS[k] 中的运算符编号 0-3 与 _OP_FUNCS 的顺序一致，结构编号 0-4 与 _STRUCTURES
+# 的顺序一致，并与 _EVALUATORS[k] 一一对应
+
+def _kernel_op(n1, d1, n2, d2, op):
+    """按运算符编号计算 (n1/d1) op (n2/d2)，除数为0时返回的分母为0"""
+    if op == 0:
+        return n1 * d2 + n2 * d1, d1 * d2
+    elif op == 1:
+        return n1 * d2 - n2 * d1, d1 * d2
+    elif op == 2:
+        return n1 * n2, d1 * d2
+    return n1 * d2, d1 * n2
+
+def _solve_kernel(perms, combos, mask):
+    """对每个排列和每个 (结构, 运算符) 组合求值，结果为24时把 mask[i][k] 置为1"""
+    for i in range(len(perms)):
+        a, b, c, d = perms[i][0], perms[i][1], perms[i][2], perms[i][3]
+        for k in range(len(combos)):
+            s, op1, op2, op3 = combos[k][0], combos[k][1], combos[k][2], combos[k][3]
+            if s == 0:    # ((a op1 b) op2 c) op3 d
+                n, m = _kernel_op(a, 1, b, 1, op1)
+                if m == 0:
+                    continue
+                n, m = _kernel_op(n, m, c, 1, op2)
+                if m == 0:
+                    continue
+                n, m = _kernel_op(n, m, d, 1, op3)
+            elif s == 1:  # (a op1 (b op2 c)) op3 d
+                n2, m2 = _kernel_op(b, 1, c, 1, op2)
+                if m2 == 0:
+                    continue
+                n, m = _kernel_op(a, 1, n2, m2, op1)
+                if m == 0:
+                    continue
+                n, m = _kernel_op(n, m, d, 1, op3)
+            elif s == 2:  # (a op1 b) op2 (c op3 d)
+                n1, m1 = _kernel_op(a, 1, b, 1, op1)
+                n2, m2 = _kernel_op(c, 1, d, 1, op3)
+                if m1 == 0 or m2 == 0:
+                    continue
+                n, m = _kernel_op(n1, m1, n2, m2, op2)
+            elif s == 3:  # a op1 ((b op2 c) op3 d)
+                n2, m2 = _kernel_op(b, 1, c, 1, op2)
+                if m2 == 0:
+                    continue
+                n2, m2 = _kernel_op(n2, m2, d, 1, op3)
+                if m2 == 0:
+                    continue
+                n, m = _kernel_op(a, 1, n2, m2, op1)
+            else:         # a op1 (b op2 (c op3 d))
+                n2, m2 = _kernel_op(c, 1, d, 1, op3)
+                if m2 == 0:
+                    continue
+                n2, m2 = _kernel_op(b, 1, n2, m2, op2)
+                if m2 == 0:
+                    continue
+                n, m = _kernel_op(a, 1, n2, m2, op1)
+            if m != 0 and n == 24 * m:
+                mask[i][k] = 1
+
+if njit is not None:
+    _kernel_op = njit(cache=True)(_kernel_op)
+    _solve_kernel = njit(cache=True)(_solve_kernel)
+
+# numba 内核与 numpy 向量化搜索都使用不约分的 int64 运算，输入过大时会静默溢出。含 L 个数的子表达式，
+# 分子、分母的绝对值不超过 2^(L-1) * M^L（M 为输入绝对值的上界：加减时两项之和，
+# 乘除时两边之积），最后比较的 24 * 分母不超过 24 * 8 * M^4。
+# M = 10^4 时约为 1.9e18，小于 2^63
+_INT64_SAFE_MAX: Final = 10 ** 4
+
+def _fits_int64(permutations: List[Tuple[int, ...]]) -> bool:
+    """
+    所有输入都是 int 且绝对值不超过 _INT64_SAFE_MAX 时，int64 内核的结果才可靠。
+    浮点数等其他类型在转换为 int64 数组时会被静默截断
+    """
+    return all(
+        isinstance(x, int) and abs(x) <= _INT64_SAFE_MAX
+        for perm in permutations for x in perm
+    )
+
+# ============================================================================
+# NumPy 向量化搜索（一次计算所有 排列 × 运算符组合）
+# ============================================================================
+
+def _np_op(x, y, op):
+    """
+    对 (分子数组, 分母数组, 是否有效) 形式的数逐元素计算，op 为运算符编号数组。
+    除数为0的位置标记为无效。
+    """
+    n1, d1, ok1 = x
+    n2, d2, ok2 = y
+    num = np.select(
+        [op == 0, op == 1, op == 2],
+        [n1 * d2 + n2 * d1, n1 * d2 - n2 * d1, n1 * n2],
+        n1 * d2,
+    )
+    den = np.where(op == 3, d1 * n2, d1 * d2)
+    return num, den, ok1 & ok2 & (den != 0)
+
+def _solve_vectorized(perms, combos):
+    """
+    perms 为 (排列数, 4) 数组，combos 为 (组合数, 4) 数组，
+    返回 (排列数, 组合数) 的布尔数组，结果为24的位置为 True
+    """
+    ones = np.ones((len(perms), 1), dtype=np.int64)
+    valid = np.ones((len(perms), 1), dtype=bool)
+    a, b, c, d = [(perms[:, i:i + 1], ones, valid) for i in range(4)]
+    mask = np.zeros((len(perms), len(combos)), dtype=bool)
+    for s in range(len(_STRUCTURES)):
+        cols = np.nonzero(combos[:, 0] == s)[0]
+        op1, op2, op3 = [combos[cols, j][None, :] for j in (1, 2, 3)]
+        if s == 0:    # ((a op1 b) op2 c) op3 d
+            r = _np_op(_np_op(_np_op(a, b, op1), c, op2), d, op3)
+        elif s == 1:  # (a op1 (b op2 c)) op3 d
+            r = _np_op(_np_op(a, _np_op(b, c, op2), op1), d, op3)
+        elif s == 2:  # (a op1 b) op2 (c op3 d)
+            r = _np_op(_np_op(a, b, op1), _np_op(c, d, op3), op2)
+        elif s == 3:  # a op1 ((b op2 c) op3 d)
+            r = _np_op(a, _np_op(_np_op(b, c, op2), d, op3), op1)
+        else:         # a op1 (b op2 (c op3 d))
+            r = _np_op(a, _np_op(b, _np_op(c, d, op3), op2), op1)
+        num, den, ok = r
+        mask[:, cols] = ok & (num == 24 * den)
+    return mask
+
+if np is not None:
+    _COMBO_ARRAY = np.array(_COMBOS, dtype=np.int64)
+
 class Game24:
     """24点游戏类"""
     
@@ -49,53 +332,27 @@ class Game24:
         """随机抽取指定数量的牌"""
         return random.sample(self.deck, num)
     
-    def evaluate_expression(self, a: float, b: float, c: float, d: float, 
-                          op1: str, op2: str, op3: str, structure: str) -> Tuple[bool, str]:
+    def evaluate_expression(self, a: int, b: int, c: int, d: int,
+                          op1: str, op2: str, op3: str, structure_id: int) -> Tuple[bool, str]:
         """
         计算表达式的值
-        structure: 表达式结构，如 "((a op1 b) op2 c) op3 d"
+        structure_id: 表达式结构编号 0-4，如 0 表示 "((a op1 b) op2 c) op3 d"，见 _STRUCTURES
+        只有结果为24时才返回表达式字符串，否则返回 (False, "")
         """
+        if not 0 <= structure_id < len(_STRUCTURES):
+            return False, ""
+        make, template = _STRUCTURES[structure_id]
         try:
-            # 使用 Fraction 进行精确计算
-            a, b, c, d = Fraction(a), Fraction(b), Fraction(c), Fraction(d)
-            
-            def apply_op(x: Fraction, y: Fraction, op: str) -> Fraction:
-                if op == '+':
-                    return x + y
-                elif op == '-':
-                    return x - y
-                elif op == '*':
-                    return x * y
-                elif op == '/':
-                    if y == 0:
-                        raise ZeroDivisionError
-                    return x / y
-            
-            # 根据不同的结构计算
-            if structure == "((a op1 b) op2 c) op3 d":
-                result = apply_op(apply_op(apply_op(a, b, op1), c, op2), d, op3)
-                expr = f"(({a} {op1} {b}) {op2} {c}) {op3} {d}"
-            elif structure == "(a op1 (b op2 c)) op3 d":
-                result = apply_op(apply_op(a, apply_op(b, c, op2), op1), d, op3)
-                expr = f"({a} {op1} ({b} {op2} {c})) {op3} {d}"
-            elif structure == "(a op1 b) op2 (c op3 d)":
-                result = apply_op(apply_op(a, b, op1), apply_op(c, d, op3), op2)
-                expr = f"({a} {op1} {b}) {op2} ({c} {op3} {d})"
-            elif structure == "a op1 ((b op2 c) op3 d)":
-                result = apply_op(a, apply_op(apply_op(b, c, op2), d, op3), op1)
-                expr = f"{a} {op1} (({b} {op2} {c}) {op3} {d})"
-            elif structure == "a op1 (b op2 (c op3 d))":
-                result = apply_op(a, apply_op(b, apply_op(c, d, op3), op2), op1)
-                expr = f"{a} {op1} ({b} {op2} ({c} {op3} {d}))"
-            
-            # 检查结果是否为24
-            if abs(result - 24) < 1e-9:
-                return True, expr
-            else:
-                return False, expr
-                
-        except (ZeroDivisionError, ValueError):
+            evaluate = make(_OP_FUNCS[op1], _OP_FUNCS[op2], _OP_FUNCS[op3])
+        except KeyError:
+            return False, ""
+        
+        # 检查结果是否为24（分母可能为负，交叉相乘即可精确比较）
+        result = evaluate((a, 1), (b, 1), (c, 1), (d, 1))
+        if result is None or result[0] != 24 * result[1]:
             return False, ""
+        
+        return True, template.format(a=a, b=b, c=c, d=d, op1=op1, op2=op2, op3=op3)
     
     def find_all_solutions(self, cards: List[Card]) -> List[str]:
         """找到所有可能的解法"""
@@ -104,47 +361,178 @@ class Game24:
     
     def find_all_solutions_from_numbers(self, numbers: List[int], keep_order: bool = True) -> List[str]:
         """从数字列表找到所有可能的解法"""
-        solutions = set()
-        operations = ['+', '-', '*', '/']
-        structures = [
-            "((a op1 b) op2 c) op3 d",
-            "(a op1 (b op2 c)) op3 d", 
-            "(a op1 b) op2 (c op3 d)",
-            "a op1 ((b op2 c) op3 d)",
-            "a op1 (b op2 (c op3 d))"
-        ]
-        
+        # 不保持顺序时会尝试所有排列，同一组数字无论输入顺序如何结果都相同，
+        # 因此按排序后的元组缓存
+        key = tuple(numbers) if keep_order else tuple(sorted(numbers))
+        return list(self._solve_cached(key, keep_order))
+    
+    @staticmethod
+    @functools.lru_cache(maxsize=None)
+    def _solve_cached(numbers: Tuple[int, ...], keep_order: bool) -> Tuple[str, ...]:
+        """搜索解法并缓存结果"""
         # 如果保持顺序，只使用原始顺序；否则尝试所有排列
         if keep_order:
-            permutations = [tuple(numbers)]
+            permutations = [numbers]
+        else:
+            # 有重复数字时，相同的排列只需搜索一次
+            permutations = list(set(itertools.permutations(numbers)))
+        
+        # 1-13 范围内的数字直接查预先计算好的表
+        table = _get_solution_table()
+        if numbers in table:
+            if keep_order:
+                # 表中的结果已经去重并排好序
+                return table[numbers]
+            solutions = set().union(*(table[perm] for perm in permutations))
         else:
-            permutations = list(itertools.permutations(numbers))
+            solutions = set().union(*Game24._search(permutations))
         
-        # 尝试指定的数字排列
-        for perm in permutations:
+        return tuple(sorted(solutions))
+    
+    @staticmethod
+    def _search(permutations: List[Tuple[int, ...]]) -> List[Set[str]]:
+        """对给定的数字排列做穷举搜索，返回每个排列各自的解法"""
+        # 超出 int64 安全范围的输入只能用 Python 的任意精度整数计算
+        fits_int64 = _fits_int64(permutations)
+        if njit is not None and fits_int64:
+            return Game24._solve_with_kernel(permutations)
+        if np is not None and fits_int64:
+            return Game24._solve_with_numpy(permutations)
+        return Game24._solve_with_evaluators(permutations)
+    
+    @staticmethod
+    def _solve_with_evaluators(permutations: List[Tuple[int, ...]]) -> List[Set[str]]:
+        """纯 Python 路径：依次调用预先生成的表达式"""
+        solutions = [set() for _ in permutations]
+        for i, perm in enumerate(permutations):
             a, b, c, d = perm
+            pa, pb, pc, pd = (a, 1), (b, 1), (c, 1), (d, 1)
             
-            # 尝试所有运算符组合
-            for ops in itertools.product(operations, repeat=3):
-                op1, op2, op3 = ops
-                
-                # 尝试所有表达式结构
-                for structure in structures:
-                    is_solution, expr = self.evaluate_expression(a, b, c, d, op1, op2, op3, structure)
-                    if is_solution:
-                        solutions.add(expr)
-        
-        return sorted(list(solutions))
+            # 只有结果为24时才格式化表达式
+            for evaluate, template in _EVALUATORS:
+                result = evaluate(pa, pb, pc, pd)
+                if result is not None and result[0] == 24 * result[1]:
+                    solutions[i].add(template.format(a=a, b=b, c=c, d=d))
+        return solutions
+    
+    @staticmethod
+    def _solve_with_kernel(permutations: List[Tuple[int, ...]]) -> List[Set[str]]:
+        """numba 路径：内核只返回命中标记，Python 只负责格式化命中的表达式"""
+        mask = np.zeros((len(permutations), len(_COMBOS)), dtype=np.int8)
+        _solve_kernel(np.array(permutations, dtype=np.int64), _COMBO_ARRAY, mask)
+        return Game24._format_hits(permutations, mask)
+    
+    @staticmethod
+    def _solve_with_numpy(permutations: List[Tuple[int, ...]]) -> List[Set[str]]:
+        """numpy 路径：向量化计算所有组合，Python 只负责格式化命中的表达式"""
+        mask = _solve_vectorized(np.array(permutations, dtype=np.int64), _COMBO_ARRAY)
+        return Game24._format_hits(permutations, mask)
+    
+    @staticmethod
+    def _format_hits(permutations: List[Tuple[int, ...]], mask) -> List[Set[str]]:
+        """把命中标记 mask[i][k] 转换为每个排列的表达式字符串"""
+        solutions = [set() for _ in permutations]
+        for i, k in zip(*np.nonzero(mask)):
+            a, b, c, d = permutations[i]
+            solutions[i].add(_EVALUATORS[k][1].format(a=a, b=b, c=c, d=d))
+        return solutions
     
     def has_solution(self, cards: List[Card]) -> bool:
         """检查是否有解"""
-        solutions = self.find_all_solutions(cards)
-        return len(solutions) > 0
+        return self._any_solution([card.value for card in cards])
+    
+    @staticmethod
+    def _any_solution(numbers: List[int]) -> bool:
+        """按给定顺序搜索，找到第一个解就返回，不格式化表达式"""
+        operands = [(x, 1) for x in numbers]
+        for evaluate, _ in _EVALUATORS:
+            result = evaluate(*operands)
+            if result is not None and result[0] == 24 * result[1]:
+                return True
+        return False
+
+# ============================================================================
+# 预先计算的解法表
+# ============================================================================
+
+# 牌面只有 1-13，按顺序排列的4个数字共 13^4 种，全部算好后查询只需一次字典查找。
+# 表按有序元组存储，保持顺序与不保持顺序的查询都可以由它得到
+_TABLE_PATH: Final = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.game24_table.pkl')
+_CARD_RANGE: Final = range(1, 14)
+# 解法表的格式/算法版本：修改搜索的运算逻辑（而显示模板不变）时必须加1，使已保存的表失效
+_TABLE_FORMAT_VERSION: Final = 1
+
+def _build_solution_table(parallel: bool = False) -> Dict[Tuple[int, ...], Tuple[str, ...]]:
+    """
+    对所有 1-13 的有序4元组搜索解法，按第一个数字分成13块。
+    parallel 为 True 且有多个 CPU 时用进程池并行计算。
+    """
+    chunks = [
+        list(itertools.product([first], _CARD_RANGE, _CARD_RANGE, _CARD_RANGE))
+        for first in _CARD_RANGE
+    ]
+    results = None
+    if parallel and (os.cpu_count() or 1) > 1:
+        try:
+            with multiprocessing.Pool() as pool:
+                results = pool.map(Game24._search, chunks)
+        except Exception:
+            # 无法创建进程池、序列化失败或子进程出错时，退回到单进程计算
+            results = None
+    if results is None:
+        results = [Game24._search(chunk) for chunk in chunks]
+    
+    table = {}
+    for chunk, chunk_solutions in zip(chunks, results):
+        for numbers, solutions in zip(chunk, chunk_solutions):
+            table[numbers] = tuple(sorted(solutions))
+    return table
+
+@functools.lru_cache(maxsize=None)
+def _get_solution_table() -> Dict[Tuple[int, ...], Tuple[str, ...]]:
+    """
+    获取解法表：优先从磁盘读取，否则重新计算并保存。
+    搜索的表达式或 _TABLE_FORMAT_VERSION 变化时，已保存的表自动失效。
+    """
+    version = (_TABLE_FORMAT_VERSION, tuple(template for _, template in _EVALUATORS))
+    try:
+        with open(_TABLE_PATH, 'rb') as f:
+            saved_version, table = pickle.load(f)
+        if saved_version == version:
+            return table
+    except (OSError, pickle.PickleError, EOFError, ValueError, TypeError, AttributeError):
+        # 文件不存在、损坏或结构不符时重新计算
+        pass
+    
+    # 只有作为主程序运行时才启动进程池：此时脚本有 __main__ 保护，
+    # 被其他模块导入时在库调用中启动进程池可能出错
+    table = _build_solution_table(parallel=__name__ == '__main__')
+    try:
+        with open(_TABLE_PATH, 'wb') as f:
+            pickle.dump((version, table), f, protocol=pickle.HIGHEST_PROTOCOL)
+    except OSError:
+        pass
+    return table
 
 # ============================================================================
 # 测试用例
 # ============================================================================
 
+def _reset_solution_caches():
+    """清空内存中的解法表和查询缓存"""
+    _get_solution_table.cache_clear()
+    Game24._solve_cached.cache_clear()
+
+def setUpModule():
+    """测试使用临时目录中的解法表，既不写入源码目录，也不受其中已有文件的影响"""
+    table_dir = tempfile.TemporaryDirectory()
+    unittest.addModuleCleanup(table_dir.cleanup)
+    table_patch = patch.object(sys.modules[__name__], '_TABLE_PATH', os.path.join(table_dir.name, 'table.pkl'))
+    table_patch.start()
+    unittest.addModuleCleanup(table_patch.stop)
+    _reset_solution_caches()
+    unittest.addModuleCleanup(_reset_solution_caches)
+
 class TestCard(unittest.TestCase):
     """测试Card类"""
     
@@ -176,6 +564,13 @@ class TestCard(unittest.TestCase):
         card = Card('♠', 'A')
         self.assertEqual(str(card), '♠A')
         self.assertEqual(repr(card), '♠A')
+    
+    def test_card_slots(self):
+        """测试卡片不再带有实例字典"""
+        card = Card('♠', 'A')
+        self.assertFalse(hasattr(card, '__dict__'))
+        with self.assertRaises(AttributeError):
+            card.color = 'black'
 
 class TestGame24(unittest.TestCase):
     """测试Game24类"""
@@ -208,25 +603,46 @@ class TestGame24(unittest.TestCase):
         """测试基本运算表达式计算"""
         # 测试加法: (6 + 6) + (6 + 6) = 24
         is_solution, expr = self.game.evaluate_expression(
-            6, 6, 6, 6, '+', '+', '+', "(a op1 b) op2 (c op3 d)"
+            6, 6, 6, 6, '+', '+', '+', 2  # (a op1 b) op2 (c op3 d)
         )
         self.assertTrue(is_solution)
         self.assertIn('6 + 6', expr)
         
         # 测试乘法: 6 * 4 * 1 * 1 = 24
         is_solution, expr = self.game.evaluate_expression(
-            6, 4, 1, 1, '*', '*', '*', "((a op1 b) op2 c) op3 d"
+            6, 4, 1, 1, '*', '*', '*', 0  # ((a op1 b) op2 c) op3 d
         )
         self.assertTrue(is_solution)
+        
+        # 结果不是24时不生成表达式: ((1 + 2) + 3) + 4 = 10
+        is_solution, expr = self.game.evaluate_expression(
+            1, 2, 3, 4, '+', '+', '+', 0  # ((a op1 b) op2 c) op3 d
+        )
+        self.assertFalse(is_solution)
+        self.assertEqual(expr, "")
     
     def test_evaluate_expression_division_by_zero(self):
         """测试除零错误处理"""
         is_solution, expr = self.game.evaluate_expression(
-            1, 0, 2, 3, '/', '+', '+', "((a op1 b) op2 c) op3 d"
+            1, 0, 2, 3, '/', '+', '+', 0  # ((a op1 b) op2 c) op3 d
         )
         self.assertFalse(is_solution)
         self.assertEqual(expr, "")
     
+    def test_evaluate_expression_exact(self):
+        """测试结果必须精确等于24，而不是在误差范围内接近24"""
+        # (240000000001 / 10000000000) * 1 * 1 = 24.0000000001
+        is_solution, _ = self.game.evaluate_expression(
+            24 * 10 ** 10 + 1, 10 ** 10, 1, 1, '/', '*', '*', 0  # ((a op1 b) op2 c) op3 d
+        )
+        self.assertFalse(is_solution)
+        
+        # 8 / (3 - 8 / 3) = 24，中间结果不是整数
+        is_solution, _ = self.game.evaluate_expression(
+            8, 3, 8, 3, '/', '-', '/', 4  # a op1 (b op2 (c op3 d))
+        )
+        self.assertTrue(is_solution)
+    
     def test_find_solutions_known_cases(self):
         """测试已知有解的情况"""
         # 测试经典的24点题目
@@ -259,6 +675,117 @@ class TestGame24(unittest.TestCase):
         # 保持顺序的解法数量应该 <= 所有排列的解法数量
         self.assertLessEqual(len(solutions_ordered), len(solutions_all))
     
+    def test_search_large_numbers(self):
+        """测试超出 int64 范围的输入不会溢出，且与纯 Python 路径结果一致"""
+        big = 2 ** 32
+        numbers = (24 * big, big, big, big)
+        self.assertFalse(_fits_int64([numbers]))
+        solutions = Game24._search([numbers])
+        self.assertEqual(solutions, Game24._solve_with_evaluators([numbers]))
+        self.assertIn(f"(({24 * big} / {big}) * {big}) / {big}", solutions[0])
+        self.assertNotIn(f"({24 * big} / {big}) + ({big} * {big})", solutions[0])
+        
+        huge = (24 * 2 ** 70, 2 ** 70, 1, 1)
+        self.assertEqual(Game24._search([huge]), Game24._solve_with_evaluators([huge]))
+        self.assertGreater(len(Game24._search([huge])[0]), 0)
+        
+        # 非整数输入不能交给 int64 路径，否则 0.5 会被截断为 0
+        floats = (0.5, 12, 1, 1)
+        self.assertFalse(_fits_int64([floats]))
+        self.assertEqual(Game24._search([floats]), Game24._solve_with_evaluators([floats]))
+        solutions = self.game.find_all_solutions_from_numbers(list(floats))
+        self.assertNotIn('(0.5 + 12) * (1 + 1)', solutions)
+        self.assertNotIn('0.5 + (12 * (1 + 1))', solutions)
+    
+    def test_solve_kernel_matches_evaluators(self):
+        """测试穷举内核与逐个调用表达式的结果一致"""
+        kernel = getattr(_solve_kernel, 'py_func', _solve_kernel)
+        for numbers in ([8, 3, 8, 3], [6, 6, 2, 2], [1, 5, 5, 5], [1, 1, 1, 1]):
+            with self.subTest(numbers=numbers):
+                perms = list(itertools.permutations(numbers))
+                mask = [[0] * len(_COMBOS) for _ in perms]
+                kernel(perms, _COMBOS, mask)
+                hits = [set() for _ in perms]
+                for i, row in enumerate(mask):
+                    a, b, c, d = perms[i]
+                    for k, hit in enumerate(row):
+                        if hit:
+                            hits[i].add(_EVALUATORS[k][1].format(a=a, b=b, c=c, d=d))
+                self.assertEqual(hits, self.game._solve_with_evaluators(perms))
+    
+    @unittest.skipIf(njit is None, "未安装 numba")
+    def test_compiled_kernel_matches_evaluators(self):
+        """测试 numba 编译后的内核与逐个调用表达式的结果一致"""
+        for numbers in ([8, 3, 8, 3], [6, 6, 2, 2], [1, 5, 5, 5], [1, 1, 1, 1], [13, 13, 13, 13]):
+            with self.subTest(numbers=numbers):
+                perms = list(itertools.permutations(numbers))
+                self.assertEqual(
+                    self.game._solve_with_kernel(perms),
+                    self.game._solve_with_evaluators(perms),
+                )
+        
+        # 安全范围上界附近的输入也不应溢出
+        limit = _INT64_SAFE_MAX
+        perms = [(limit, -limit, limit, limit), (limit, limit - 1, -limit, 7), (limit, 1, limit, 1)]
+        self.assertTrue(_fits_int64(perms))
+        self.assertEqual(self.game._solve_with_kernel(perms), self.game._solve_with_evaluators(perms))
+    
+    @unittest.skipIf(np is None, "未安装 numpy")
+    def test_solve_vectorized_matches_evaluators(self):
+        """测试 numpy 向量化搜索与逐个调用表达式的结果一致"""
+        for numbers in ([8, 3, 8, 3], [6, 6, 2, 2], [1, 5, 5, 5], [1, 1, 1, 1]):
+            with self.subTest(numbers=numbers):
+                perms = list(itertools.permutations(numbers))
+                self.assertEqual(
+                    self.game._solve_with_numpy(perms),
+                    self.game._solve_with_evaluators(perms),
+                )
+    
+    def test_equivalent_expressions_pruned(self):
+        """测试代数等价的表达式只保留一个"""
+        self.assertLess(len(_EVALUATORS), 5 * 4 ** 3)
+        solutions = self.game.find_all_solutions_from_numbers([6, 6, 6, 6], keep_order=True)
+        all_additions = [s for s in solutions if '-' not in s and '*' not in s and '/' not in s]
+        self.assertEqual(len(all_additions), 1)
+    
+    def test_find_solutions_cached_by_multiset(self):
+        """测试不保持顺序时，同一组数字的不同输入顺序结果相同"""
+        solutions = self.game.find_all_solutions_from_numbers([8, 3, 8, 3], keep_order=False)
+        self.assertEqual(self.game.find_all_solutions_from_numbers([3, 3, 8, 8], keep_order=False), solutions)
+        
+        # 修改返回的列表不应影响缓存
+        solutions.clear()
+        self.assertGreater(len(self.game.find_all_solutions_from_numbers([8, 3, 8, 3], keep_order=False)), 0)
+    
+    def test_solution_table_matches_search(self):
+        """测试预先计算的解法表与纯 Python 参考路径的结果一致（无论表由哪条路径生成）"""
+        table = _get_solution_table()
+        self.assertEqual(len(table), 13 ** 4)
+        for numbers in [(8, 3, 8, 3), (6, 6, 2, 2), (1, 1, 1, 1), (13, 11, 7, 5), (1, 5, 5, 5)]:
+            with self.subTest(numbers=numbers):
+                self.assertEqual(table[numbers], tuple(sorted(Game24._solve_with_evaluators([numbers])[0])))
+    
+    def test_solution_table_rejects_stale_file(self):
+        """测试版本不符或结构不符的解法表文件会被重新计算"""
+        self.addCleanup(_reset_solution_caches)
+        self.addCleanup(lambda: os.path.exists(_TABLE_PATH) and os.remove(_TABLE_PATH))
+        version = (_TABLE_FORMAT_VERSION, tuple(template for _, template in _EVALUATORS))
+        rebuilt = {(1, 1, 1, 1): ('rebuilt',)}
+        stale_contents = [
+            ((_TABLE_FORMAT_VERSION - 1, version[1]), {(1, 1, 1, 1): ('stale',)}),
+            42,
+            ('not', 'a', 'pair'),
+        ]
+        for contents in stale_contents:
+            with self.subTest(contents=contents):
+                with open(_TABLE_PATH, 'wb') as f:
+                    pickle.dump(contents, f)
+                _reset_solution_caches()
+                with patch.object(sys.modules[__name__], '_build_solution_table', return_value=rebuilt):
+                    self.assertEqual(_get_solution_table(), rebuilt)
+                with open(_TABLE_PATH, 'rb') as f:
+                    self.assertEqual(pickle.load(f), (version, rebuilt))
+    
     def test_has_solution(self):
         """测试是否有解的判断"""
         # 创建测试卡片
@@ -271,6 +798,21 @@ class TestGame24(unittest.TestCase):
         
         self.assertTrue(self.game.has_solution(cards_with_solution))
         self.assertFalse(self.game.has_solution(cards_no_solution))
+    
+    def test_build_solution_table_pool_failure(self):
+        """测试进程池出错时退回到单进程计算"""
+        with patch('multiprocessing.Pool', side_effect=RuntimeError("bootstrapping")), \
+                patch('os.cpu_count', return_value=4):
+            table = _build_solution_table(parallel=True)
+        self.assertEqual(len(table), 13 ** 4)
+        self.assertEqual(table[(8, 3, 8, 3)], ('8 / (3 - (8 / 3))',))
+    
+    def test_any_solution_agrees_with_find_all(self):
+        """测试提前返回的判断与完整搜索一致"""
+        for numbers in ([6, 6, 2, 2], [8, 3, 8, 3], [3, 8, 3, 8], [1, 1, 1, 1], [13, 13, 13, 13]):
+            with self.subTest(numbers=numbers):
+                expected = len(self.game.find_all_solutions_from_numbers(numbers, keep_order=True)) > 0
+                self.assertEqual(self.game._any_solution(numbers), expected)
 
 class TestInputParsing(unittest.TestCase):
     """测试输入解析功能"""
@@ -278,52 +820,28 @@ class TestInputParsing(unittest.TestCase):
     @patch('builtins.input')
     def test_get_numbers_input_formats(self, mock_input):
         """测试各种输入格式"""
-        # 由于get_numbers_input是在主程序中定义的，我们这里测试输入解析逻辑
         test_cases = [
             ("[6,6,2,2]", [6, 6, 2, 2]),
             ("6,6,2,2", [6, 6, 2, 2]),
             ("6 6 2 2", [6, 6, 2, 2]),
             ("6622", [6, 6, 2, 2]),
             ("[A,K,Q,J]", [1, 13, 12, 11]),
+            ("10, 12, a, 1", [10, 12, 1, 1]),
         ]
         
         for input_str, expected in test_cases:
             with self.subTest(input_str=input_str):
-                # 模拟输入解析逻辑
-                user_input = input_str.strip()
-                
-                # 移除方括号
-                if user_input.startswith('[') and user_input.endswith(']'):
-                    user_input = user_input[1:-1]
-                
-                # 处理各种分隔符
-                if ',' in user_input:
-                    parts = user_input.split(',')
-                elif ' ' in user_input:
-                    parts = user_input.split()
-                else:
-                    if len(user_input) == 4 and all(c.isdigit() or c.upper() in 'AJQK' for c in user_input):
-                        parts = list(user_input)
+                self.assertEqual(parse_cards(input_str), expected)
                 
-                # 清理并验证输入
-                parts = [part.strip() for part in parts if part.strip()]
-                
-                # 转换为数字
-                numbers = []
-                for part in parts:
-                    part = part.upper()
-                    if part == 'A':
-                        numbers.append(1)
-                    elif part == 'J':
-                        numbers.append(11)
-                    elif part == 'Q':
-                        numbers.append(12)
-                    elif part == 'K':
-                        numbers.append(13)
-                    elif part.isdigit() and 1 <= int(part) <= 13:
-                        numbers.append(int(part))
-                
-                self.assertEqual(numbers, expected)
+                mock_input.return_value = input_str
+                self.assertEqual(get_numbers_input(), expected)
+    
+    def test_parse_cards_invalid(self):
+        """测试无效输入"""
+        for input_str in ["", "66222", "6,6,2", "6,6,2,2,2", "6,6,2,14", "6,6,2,X", "6,6,2,0"]:
+            with self.subTest(input_str=input_str):
+                with self.assertRaises(ValueError):
+                    parse_cards(input_str)
 
 class TestIntegration(unittest.TestCase):
     """集成测试"""
@@ -364,7 +882,7 @@ class TestIntegration(unittest.TestCase):
                 self.assertIsInstance(solutions, list)
 
 # ============================================================================
-# 主程序部分（保持不变）
+# 主程序部分
 # ============================================================================
 
 def display_cards(cards: List[Card]):
@@ -373,60 +891,48 @@ def display_cards(cards: List[Card]):
     for i, card in enumerate(cards, 1):
         print(f"{i}. {card} (值: {card.value})")
 
+# 输入中的分隔符：逗号或空白
+_SEPARATOR_RE: Final = re.compile(r'[\s,]+')
+# 输入时除牌面外也接受 1、11、12、13 这样的数字写法
+_CARD_VALUES: Final = {**Card._RANK_VALUES, '1': 1, '11': 11, '12': 12, '13': 13}
+
+def parse_cards(text: str) -> List[int]:
+    """
+    解析4个数字，支持 [8,7,6,5]、8,7,6,5、8 7 6 5、8765 以及 A/J/Q/K。
+    格式不正确时抛出 ValueError。
+    """
+    text = text.strip()
+    
+    # 移除方括号
+    if text.startswith('[') and text.endswith(']'):
+        text = text[1:-1]
+    
+    parts = [part for part in _SEPARATOR_RE.split(text) if part]
+    if len(parts) == 1:
+        # 没有分隔符时按字符分割（仅限4个单字符）
+        if len(parts[0]) != 4:
+            raise ValueError("请用逗号或空格分隔4个数字，或使用方括号格式")
+        parts = list(parts[0])
+    
+    if len(parts) != 4:
+        raise ValueError(f"需要输入4个数字，你输入了{len(parts)}个")
+    
+    numbers = []
+    for part in parts:
+        value = _CARD_VALUES.get(part.upper())
+        if value is None:
+            raise ValueError(f"无效数字: {part}\n请输入有效的数字 (1-13) 或字母 (A, J, Q, K)")
+        numbers.append(value)
+    return numbers
+
 def get_numbers_input():
     """获取用户输入的4个数字"""
     while True:
-        user_input = input("请输入4个数字: ").strip()
-        
-        # 移除方括号
-        if user_input.startswith('[') and user_input.endswith(']'):
-            user_input = user_input[1:-1]  # 去掉首尾的方括号
-        
-        # 处理各种分隔符
-        if ',' in user_input:
-            parts = user_input.split(',')
-        elif ' ' in user_input:
-            parts = user_input.split()
-        else:
-            # 如果没有分隔符，尝试按字符分割（如果都是单个字符）
-            if len(user_input) == 4 and all(c.isdigit() or c.upper() in 'AJQK' for c in user_input):
-                parts = list(user_input)
-            else:
-                print("❌ 请用逗号或空格分隔4个数字，或使用方括号格式")
-                continue
-        
-        # 清理并验证输入
-        parts = [part.strip() for part in parts if part.strip()]
-        
-        if len(parts) != 4:
-            print(f"❌ 需要输入4个数字，你输入了{len(parts)}个")
-            continue
-        
-        # 转换为数字
-        numbers = []
+        user_input = input("请输入4个数字: ")
         try:
-            for part in parts:
-                part = part.upper()
-                if part == 'A':
-                    numbers.append(1)
-                elif part == 'J':
-                    numbers.append(11)
-                elif part == 'Q':
-                    numbers.append(12)
-                elif part == 'K':
-                    numbers.append(13)
-                elif part.isdigit() and 1 <= int(part) <= 13:
-                    numbers.append(int(part))
-                else:
-                    raise ValueError(f"无效数字: {part}")
-            
-            # 输入成功，返回数字列表
-            return numbers
-            
+            return parse_cards(user_input)
         except ValueError as e:
             print(f"❌ {e}")
-            print("请输入有效的数字 (1-13) 或字母 (A, J, Q, K)")
-            continue
 
 def manual_input_mode():
     """手动输入模式 - 保持原始顺序"""